@@ -10,10 +10,469 @@ bl_info = {
 
 import bpy
 import os
+import re
+import errno
+import hashlib
+import io
+import queue
+import threading
+import collections
+import concurrent.futures
 import subprocess
-from bpy.props import StringProperty, PointerProperty
+import shutil
+from bpy.props import StringProperty, PointerProperty, BoolProperty, IntProperty
 from bpy.types import Operator, AddonPreferences, Panel
 
+# ------------------------------------------------------------------------
+#   Helpers
+# ------------------------------------------------------------------------
+
+# Built once here instead of per file in the scan loops
+_PNG_SUFFIXES = ('.png', '.PNG')
+_FRAME_RE = re.compile(r'(\d+)\.png', re.IGNORECASE)
+
+def walk_png_dirs(root, max_depth=6):
+    """Yield (dirpath, png_entries) for every folder under root containing PNGs
+
+    png_entries are the os.DirEntry objects of the PNGs, so callers can use
+    their cached stat. Folders more than max_depth levels below root are
+    not scanned.
+    """
+    stack = [(root, 0)]
+    while stack:
+        dirpath, depth = stack.pop()
+        pngs = []
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as it:
+                for e in it:
+                    # DirEntry caches the file type, so no extra stat per entry
+                    if e.is_dir(follow_symlinks=False):
+                        # Don't descend into the 'gifs' output folders we create
+                        if depth < max_depth and e.name != "gifs":
+                            subdirs.append((e.path, depth + 1))
+                    elif e.name.endswith(_PNG_SUFFIXES):
+                        pngs.append(e)
+        except OSError:
+            # Unreadable folder, skip it like os.walk does
+            continue
+
+        if pngs:
+            yield dirpath, pngs
+        # Reversed, so folders still come out in scandir order
+        stack.extend(reversed(subdirs))
+
+def _gif_output_file(render_dir):
+    """Return the GIF path for render_dir, inside its 'gifs' folder"""
+    # GIF output directory
+    gifs_dir = os.path.join(render_dir, "gifs")
+
+    # Output GIF name
+    # Normalize path (removes trailing slashes and unifies separators so a
+    # plain rpartition works), then drop the drive so "C:" never ends up
+    # in the name
+    clean_path = os.path.splitdrive(os.path.normpath(render_dir))[1]
+    
+    # Get Current Folder Name (e.g. "stand")
+    parent_path, _, current_folder_name = clean_path.rpartition(os.sep)
+    
+    # Get Parent Folder Name (e.g. "character")
+    parent_folder_name = parent_path.rpartition(os.sep)[2]
+    
+    # Construct Name: "character_stand.gif"
+    if parent_folder_name and current_folder_name:
+        gif_name = f"{parent_folder_name}_{current_folder_name}.gif"
+    elif current_folder_name:
+        # Fallback if at root of drive
+        gif_name = f"{current_folder_name}.gif"
+    else:
+        # Total fallback
+        gif_name = "animation.gif"
+        
+    return os.path.join(gifs_dir, gif_name)
+
+def _ffmpeg_input_args(ffmpeg_exe, fps, threads=None):
+    """Common FFmpeg arguments for reading the PNG stream we write on stdin
+
+    threads is the number of decode and filter threads, all cores by default.
+    """
+    # Let FFmpeg decode PNGs and run the palette filters on all cores,
+    # or on its share of them when several FFmpeg processes run at once
+    nthreads = str(threads or os.cpu_count() or 4)
+
+    # -y overwrites output without asking
+    # -hide_banner keeps the log we pass on to the user short
+    # -f image2pipe -i - reads the PNGs we stream on stdin
+    # -framerate sets input fps
+    return [
+        ffmpeg_exe,
+        '-threads', nthreads,
+        '-filter_threads', nthreads,
+        '-filter_complex_threads', nthreads,
+        '-hide_banner',
+        '-y',
+        '-f', 'image2pipe',
+        '-framerate', str(fps),
+        '-i', '-',
+    ]
+
+def _prefilter(fps, use_mpdecimate=True, output_height=480, output_fps=24):
+    """Filter chain applied to the frames before palettegen and paletteuse
+
+    fps is the frame rate of the source frames.
+    """
+    filters = []
+    # Downscale and cap the frame rate first, palettegen and paletteuse
+    # then touch far fewer pixels. -2 keeps the width even, min(ih, ...)
+    # leaves renders that are already small at their size.
+    if output_height > 0:
+        filters.append(f"scale=-2:'min(ih,{output_height})':flags=lanczos")
+    # Only ever lower the frame rate, fps= would duplicate frames otherwise
+    if 0 < output_fps < fps:
+        filters.append(f"fps={output_fps}")
+    # mpdecimate drops static hold frames
+    if use_mpdecimate:
+        filters.append("mpdecimate")
+    return ",".join(filters)
+
+def _build_ffmpeg_cmd(ffmpeg_exe, fps, palette_path, output_file,
+                      prefilter="", bayer_scale=5, palette_cached=False, threads=None):
+    """Build the FFmpeg command that encodes the GIF
+
+    With palette_cached the palette at palette_path is read as a second
+    input. Otherwise the same process generates it from the frames, uses
+    it, and also writes it to palette_path for the next run.
+    """
+    # Same prefilter for palettegen and paletteuse, so the palette stats
+    # match the frames that are kept. Bayer dithering keeps gradients small.
+    paletteuse = f"paletteuse=dither=bayer:bayer_scale={bayer_scale}:diff_mode=rectangle"
+    source = f"[0:v]{prefilter}," if prefilter else "[0:v]"
+    if palette_cached:
+        inputs = ['-i', palette_path]
+        filter_graph = f"{source}null[v];[v][1:v]{paletteuse}[gif]"
+        palette_output = []
+    else:
+        inputs = []
+        filter_graph = (
+            f"{source}split[a][b];"
+            "[a]palettegen=stats_mode=diff,split[p][keep];"
+            f"[b][p]{paletteuse}[gif]"
+        )
+        palette_output = ['-map', '[keep]', palette_path]
+
+    # Basic command without palette generation (faster, lower quality):
+    # cmd = [ffmpeg_exe, '-y', '-f', 'image2pipe', '-framerate', str(fps), '-i', '-', output_file]
+
+    # -vsync vfr lets mpdecimate actually drop frames instead of duplicating them back
+    return _ffmpeg_input_args(ffmpeg_exe, fps, threads) + inputs + [
+        '-filter_complex', filter_graph,
+        '-vsync', 'vfr',
+        '-map', '[gif]', output_file
+    ] + palette_output
+
+def _is_closed_pipe(e):
+    """True if OSError e means the process reading the pipe has exited"""
+    # Windows reports a write to a dead reader as EINVAL, not EPIPE
+    return isinstance(e, BrokenPipeError) or e.errno == errno.EINVAL
+
+def _run_ffmpeg(cmd, frame_paths, log=None, low_priority=True):
+    """Run FFmpeg, streaming frame_paths to its stdin in order
+
+    Every line FFmpeg writes to stderr is passed to log, if given.
+    With low_priority FFmpeg runs below normal priority, so it only takes
+    the CPU time Blender's UI doesn't need.
+    Raises subprocess.CalledProcessError if FFmpeg fails, with the tail of
+    its log as stderr. Any other error, like an unreadable frame, kills
+    FFmpeg and is raised as is.
+    """
+    creationflags = 0
+    renice = False
+    popen_cmd = cmd
+    if low_priority:
+        if os.name == 'nt':
+            creationflags = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+        else:
+            # POSIX: start FFmpeg through nice, so all its threads inherit
+            # the priority (preexec_fn is not safe with the batch worker
+            # threads around)
+            nice = shutil.which('nice')
+            if nice:
+                popen_cmd = [nice, '-n', '10'] + cmd
+            else:
+                renice = True
+
+    proc = subprocess.Popen(
+        popen_cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        creationflags=creationflags
+    )
+
+    # Without nice, renice right after the start. On Linux this only
+    # catches the main thread, threads FFmpeg already started keep theirs.
+    if renice:
+        try:
+            os.setpriority(os.PRIO_PROCESS, proc.pid, 10)
+        except OSError:
+            pass
+
+    # Drain stderr on its own thread, otherwise FFmpeg can block on a full
+    # pipe while we are still blocked writing frames to it
+    tail = collections.deque(maxlen=20)
+
+    def drain():
+        # Universal newlines also split the '\r' progress updates
+        for line in io.TextIOWrapper(proc.stderr, errors='replace'):
+            line = line.rstrip()
+            if line:
+                tail.append(line)
+                if log:
+                    log(line)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+
+    try:
+        try:
+            for path in frame_paths:
+                with open(path, 'rb') as png:
+                    proc.stdin.write(png.read())
+        except OSError as e:
+            # FFmpeg quit early, its return code tells us why
+            if not _is_closed_pipe(e):
+                raise
+    except BaseException:
+        # e.g. a frame that can't be read, don't let FFmpeg encode the rest
+        proc.kill()
+        raise
+    finally:
+        # Always reap FFmpeg and the reader thread
+        try:
+            try:
+                proc.stdin.close()
+            except OSError as e:
+                if not _is_closed_pipe(e):
+                    raise
+        finally:
+            proc.wait()
+            reader.join()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="\n".join(tail))
+
+def _convert_folder(ffmpeg_exe, render_dir, filename_prefix, fps, report=print, log=None,
+                    use_mpdecimate=True, bayer_scale=5, output_height=480, output_fps=24,
+                    low_priority=True, threads=None):
+    """Convert the PNG sequence in render_dir to a GIF, returns True on success
+
+    ffmpeg_exe must already be validated with _ffmpeg_is_valid.
+    Does not touch bpy data, so it is safe to call from worker threads.
+    report is called as report({'LEVEL'}, message), like Operator.report.
+    log receives each line of FFmpeg output, see _run_ffmpeg.
+    threads limits FFmpeg's threads, see _ffmpeg_input_args.
+    """
+    # Check for PNGs in the directory
+    # scandir keeps the dirent type, so is_file() costs no extra stat
+    try:
+        with os.scandir(render_dir) as it:
+            files = [
+                e for e in it
+                if e.name.endswith(_PNG_SUFFIXES) and e.is_file(follow_symlinks=False)
+            ]
+    except FileNotFoundError:
+        report({'ERROR'}, "Render directory does not exist.")
+        return False
+
+    # Order the frames numerically from the names we just scanned
+    # (this handles any padding width and start frame, and FFmpeg never has
+    # to scan the folder again). Only prefix + number + .png counts, so a
+    # second sequence like "anim_shadow_0001.png" is not mixed in.
+    start_pos = len(filename_prefix)
+    frames = sorted(
+        (int(m.group(1)), e.name, e)
+        for m, e in (
+            (_FRAME_RE.fullmatch(e.name, start_pos), e)
+            for e in files if e.name.startswith(filename_prefix)
+        )
+        if m
+    )
+
+    if not frames:
+        report({'ERROR'}, "Error: No PNGs rendered at location")
+        print("Error: No PNGs rendered at location")
+        return False
+
+    # Warn about holes in the frame range before spending the encode on it
+    start, end, count = frames[0][0], frames[-1][0], len(frames)
+    if end - start + 1 != count:
+        report({'WARNING'}, f"Frames {start}-{end}: {end - start + 1 - count} missing, "
+                            f"converting the {count} found")
+
+    frame_paths = [e.path for _, _, e in frames]
+    # Setup GIF output directory
+    output_file = _gif_output_file(render_dir)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    prefilter = _prefilter(fps, use_mpdecimate, output_height, output_fps)
+
+    # Reuse the palette from the last run if no frame changed since.
+    # The folder mtime catches added or deleted frames, the 'gifs' folder
+    # itself was created above, before any palette could be written.
+    # The name is keyed on the sequence and the prefilter, so other
+    # settings or a second sequence in the folder get their own palette.
+    palette_key = hashlib.sha1(f"{filename_prefix}\0{prefilter}".encode()).hexdigest()[:10]
+    palette_path = os.path.join(os.path.dirname(output_file), f".palette_{palette_key}.png")
+    src_mtime = max(
+        os.stat(render_dir).st_mtime,
+        max(e.stat().st_mtime for _, _, e in frames)
+    )
+    try:
+        palette_fresh = os.path.getmtime(palette_path) > src_mtime
+    except OSError:
+        palette_fresh = False
+
+    try:
+        report({'INFO'}, f"Converting to GIF at: {output_file}")
+        # One FFmpeg process, which also refreshes the palette if needed
+        _run_ffmpeg(
+            _build_ffmpeg_cmd(
+                ffmpeg_exe, fps, palette_path, output_file,
+                prefilter=prefilter,
+                bayer_scale=bayer_scale,
+                palette_cached=palette_fresh,
+                threads=threads,
+            ),
+            frame_paths,
+            log=log,
+            low_priority=low_priority
+        )
+        report({'INFO'}, "GIF Conversion Finished!")
+    except subprocess.CalledProcessError as e:
+        report({'ERROR'}, f"FFmpeg Error: {e}")
+        if e.stderr:
+            report({'ERROR'}, e.stderr)
+        # Don't let a half written palette pass as cached next time
+        if not palette_fresh:
+            try:
+                os.remove(palette_path)
+            except OSError:
+                pass
+        return False
+    return True
+
+def _ffmpeg_is_valid(ffmpeg_exe):
+    """Check the FFmpeg path once per operator run, callers pass it on validated"""
+    # isfile() is False for missing paths too, so a single stat is enough
+    return bool(ffmpeg_exe) and os.path.isfile(ffmpeg_exe)
+
+def _render_target(scene):
+    """Return (render_dir, filename_prefix) for the scene's render output path"""
+    # Get Render Path details
+    filepath = scene.render.filepath
+    abs_filepath = bpy.path.abspath(filepath)
+    render_dir = os.path.dirname(abs_filepath)
+    filename_prefix = os.path.basename(abs_filepath)
+    
+    # If output path is empty, default to tmp
+    if not render_dir:
+        render_dir = bpy.path.abspath("//")
+
+    return render_dir, filename_prefix
+
+def _encode_options(preferences):
+    """Copy the encode settings out of the add-on preferences
+
+    Returns plain values that can be handed to worker threads as
+    _convert_folder keyword arguments.
+    """
+    return {
+        'use_mpdecimate': preferences.use_mpdecimate,
+        'bayer_scale': preferences.bayer_scale,
+        'output_height': preferences.output_height,
+        'output_fps': preferences.output_fps,
+        'low_priority': preferences.low_priority,
+    }
+
+def _batch_convert(ffmpeg_exe, root_folder, fps, report=print, log=None,
+                   max_depth=6, skip_up_to_date=True, **options):
+    """Convert every PNG folder under root_folder, several at a time
+
+    options are passed on to _convert_folder. Like it, this never touches
+    bpy data, so it runs on the batch operator's worker thread.
+    """
+    jobs = []
+    folders_skipped = 0
+
+    # 1. Walk through directory tree
+    for dirpath, entries in walk_png_dirs(root_folder, max_depth):
+        # 2. Skip folders whose GIF is newer than every PNG (and than the
+        # folder itself, which catches deleted frames)
+        if skip_up_to_date:
+            try:
+                gif_mtime = os.path.getmtime(_gif_output_file(dirpath))
+            except OSError:
+                gif_mtime = None
+            if gif_mtime is not None:
+                # DirEntry.stat() is cached from the scan on Windows
+                src_mtime = max(
+                    os.stat(dirpath).st_mtime,
+                    max(e.stat().st_mtime for e in entries)
+                )
+                if gif_mtime > src_mtime:
+                    report({'INFO'}, f"Skipping Folder: {dirpath} | GIF is up to date")
+                    folders_skipped += 1
+                    continue
+
+        pngs = [e.name for e in entries]
+
+        # 3. Determine the Naming Prefix
+        # We need to guess the prefix based on the actual files found.
+        # e.g., if files are "MyAnim_0001.png", prefix is "MyAnim_"
+        
+        # The common prefix of all names is the common prefix of the
+        # smallest and largest one, so only compare those two
+        lo, hi = min(pngs), max(pngs)
+        i = 0
+        while i < len(lo) and lo[i] == hi[i]:
+            i += 1
+        common_prefix = lo[:i]
+        
+        # If the common prefix includes digits (like "00"), strip them back 
+        # so we get the base name (Blender usually pads with numbers at the end)
+        base_prefix = common_prefix.rstrip('0123456789')
+        
+        jobs.append((dirpath, base_prefix))
+
+    # 4. Convert the folders in parallel
+    # Threads are enough here, each one just blocks on its own FFmpeg process.
+    # The cores are split between the FFmpeg processes running at once.
+    cpu_count = os.cpu_count() or 2
+    max_workers = max(1, cpu_count // 2)
+    threads = max(1, cpu_count // max_workers)
+
+    def run_job(job):
+        dirpath, base_prefix = job
+        # Several folders run at once, tag their messages with the folder
+        tag = f"[{os.path.basename(dirpath)}] "
+        report({'INFO'}, f"Processing Folder: {dirpath} | Detected Prefix: '{base_prefix}'")
+        try:
+            return _convert_folder(
+                ffmpeg_exe, dirpath, base_prefix, fps,
+                report=lambda level, message: report(level, tag + message),
+                log=(lambda line: log(tag + line)) if log else None,
+                threads=threads,
+                **options
+            )
+        except Exception as e:
+            report({'WARNING'}, f"Skipping folder {dirpath} due to error: {e}")
+            return False
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+        folders_processed = sum(ex.map(run_job, jobs))
+
+    if folders_processed > 0 or folders_skipped > 0:
+        report({'INFO'}, f"Batch Complete. Processed {folders_processed} folders, "
+                         f"{folders_skipped} already up to date.")
+    else:
+        report({'WARNING'}, "Batch Complete. No PNG sequences found.")
+
 # ------------------------------------------------------------------------
 #   Add-on Preferences (To set FFmpeg Path)
 # ------------------------------------------------------------------------
@@ -28,10 +487,49 @@ class GIF_Preferences(AddonPreferences):
         default=""
     )
 
+    use_mpdecimate: BoolProperty(
+        name="Drop Duplicate Frames",
+        description="Remove static hold frames with mpdecimate before encoding",
+        default=True
+    )
+
+    bayer_scale: IntProperty(
+        name="Bayer Scale",
+        description="Bayer dither pattern scale (lower is stronger dithering, larger file)",
+        default=5,
+        min=0,
+        max=5
+    )
+
+    output_height: IntProperty(
+        name="Output Height",
+        description="Downscale the GIF to at most this height in pixels (0 keeps the render size)",
+        default=480,
+        min=0
+    )
+
+    output_fps: IntProperty(
+        name="Output FPS",
+        description="Cap the GIF frame rate (0 keeps the scene frame rate)",
+        default=24,
+        min=0
+    )
+
+    low_priority: BoolProperty(
+        name="Low FFmpeg Priority",
+        description="Run FFmpeg below normal priority so Blender stays responsive during conversions",
+        default=True
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "ffmpeg_path")
         layout.label(text="Please locate your ffmpeg executable.")
+        layout.prop(self, "use_mpdecimate")
+        layout.prop(self, "bayer_scale")
+        layout.prop(self, "output_height")
+        layout.prop(self, "output_fps")
+        layout.prop(self, "low_priority")
 
 # ------------------------------------------------------------------------
 #   Operator: Convert Existing PNGs to GIF
@@ -48,128 +546,138 @@ class GIF_OT_convert(Operator):
         ffmpeg_exe = preferences.ffmpeg_path
 
         # Validate FFmpeg path
-        if not os.path.exists(ffmpeg_exe) or not os.path.isfile(ffmpeg_exe):
+        if not _ffmpeg_is_valid(ffmpeg_exe):
             self.report({'ERROR'}, "FFmpeg path is invalid in Add-on Preferences")
             return {'CANCELLED'}
 
-        # Get Render Path details
-        filepath = scene.render.filepath
-        abs_filepath = bpy.path.abspath(filepath)
-        render_dir = os.path.dirname(abs_filepath)
-        filename_prefix = os.path.basename(abs_filepath)
-        
-        # If output path is empty, default to tmp
-        if not render_dir:
-            render_dir = bpy.path.abspath("//")
-            
-        # Check for PNGs in the directory
-        try:
-            files = [f for f in os.listdir(render_dir) if f.endswith('.png')]
-        except FileNotFoundError:
-             self.report({'ERROR'}, "Render directory does not exist.")
-             return {'CANCELLED'}
-
-        if not files:
-            self.report({'ERROR'}, "Error: No PNGs rendered at location")
-            print("Error: No PNGs rendered at location")
-            return {'CANCELLED'}
+        render_dir, filename_prefix = _render_target(scene)
 
-        # Setup GIF output directory
-        gifs_dir = os.path.join(render_dir, "gifs")
-        if not os.path.exists(gifs_dir):
-            os.makedirs(gifs_dir)
+        # Run the conversion for the render folder
+        # (blocks until FFmpeg is done, the log comes back on failure)
+        ok = _convert_folder(
+            ffmpeg_exe, render_dir, filename_prefix, scene.render.fps,
+            report=self.report,
+            **_encode_options(preferences)
+        )
 
-        # Output GIF name
-        # Normalize path (removes trailing slashes to ensure basename works)
-        clean_path = os.path.normpath(render_dir)
-        
-        # Get Current Folder Name (e.g. "stand")
-        current_folder_name = os.path.basename(clean_path)
-        
-        # Get Parent Folder Name (e.g. "character")
-        parent_path = os.path.dirname(clean_path)
-        parent_folder_name = os.path.basename(parent_path)
-        
-        # Construct Name: "character_stand.gif"
-        if parent_folder_name and current_folder_name:
-            gif_name = f"{parent_folder_name}_{current_folder_name}.gif"
-        elif current_folder_name:
-            # Fallback if at root of drive
-            gif_name = f"{current_folder_name}.gif"
-        else:
-            # Total fallback
-            gif_name = "animation.gif"
-            
-        output_file = os.path.join(gifs_dir, gif_name)
-
-        # Construct FFmpeg Input pattern
-        # Assumption: Blender Standard Naming (Name + Frame + .png)
-        # We assume 4 digit padding by default in Blender
-        input_pattern = os.path.join(render_dir, f"{filename_prefix}%04d.png")
-        
-        # Get Frame Rate
-        fps = scene.render.fps
+        return {'FINISHED'} if ok else {'CANCELLED'}
 
-        # Construct Command
-        # -y overwrites output without asking
-        # -framerate sets input fps
-        cmd = [
-            ffmpeg_exe,
-            '-y',
-            '-framerate', str(fps),
-            '-i', input_pattern,
-            '-filter_complex', "[0:v]palettegen=stats_mode=diff[p];[0:v][p]paletteuse", 
-            output_file
-        ]
-        
-        # Basic command without palette generation (faster, lower quality):
-        # cmd = [ffmpeg_exe, '-y', '-framerate', str(fps), '-i', input_pattern, output_file]
+# ------------------------------------------------------------------------
+#   Background Jobs (shared by the modal operators)
+# ------------------------------------------------------------------------
 
-        try:
-            self.report({'INFO'}, f"Converting to GIF at: {output_file}")
-            # Run FFmpeg
-            subprocess.run(cmd, check=True)
-            self.report({'INFO'}, "GIF Conversion Finished!")
-        except subprocess.CalledProcessError as e:
-            self.report({'ERROR'}, f"FFmpeg Error: {e}")
-            return {'CANCELLED'}
+class _BackgroundJob:
+    """Mixin for modal operators that convert on a worker thread
 
-        return {'FINISHED'}
+    Operator.report is not thread safe, so the worker queues its messages
+    and the operator reports them from modal() on every timer tick.
+    """
+    _timer = None
+    _thread = None
+    _messages = None
+
+    def start_job(self, window_manager, window, job):
+        """Run job(report, log) on a worker thread and start the poll timer"""
+        self._messages = queue.Queue()
+
+        def run():
+            # An uncaught error would end the thread silently, report it instead
+            try:
+                job(self.queue_report, self.queue_log)
+            except Exception as e:
+                self.queue_report({'ERROR'}, f"GIF Conversion failed: {e}")
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        # Timer to pass the FFmpeg log on to the UI while it runs
+        self._timer = window_manager.event_timer_add(0.25, window=window)
+
+    def queue_report(self, level, message):
+        self._messages.put((level, message))
+
+    def queue_log(self, line):
+        self._messages.put(({'INFO'}, line))
+
+    def pump_messages(self):
+        while True:
+            try:
+                level, message = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            self.report(level, message)
+
+    def poll_job(self, context):
+        """Report queued messages, returns True once the job has finished"""
+        self.pump_messages()
+        if self._thread.is_alive():
+            return False
+        self.pump_messages()
+        context.window_manager.event_timer_remove(self._timer)
+        return True
 
 # ------------------------------------------------------------------------
 #   Operator: Render (Modal) then Call Convert
 # ------------------------------------------------------------------------
 
-class GIF_OT_render_generate(Operator):
+class GIF_OT_render_generate(_BackgroundJob, Operator):
     """Renders animation then converts to GIF"""
     bl_idname = "gif.render_generate"
     bl_label = "Export as GIF"
     
-    _timer = None
+    _window = None
+    _failed = False
 
     def modal(self, context, event):
-        if event.type == 'TIMER':
-            # Check if the Render Job is still running
-            if context.scene.gif_is_rendering:
-                # Still rendering, do nothing
-                pass
-            else:
-                # Render finished
-                # Stop timer
-                context.window_manager.event_timer_remove(self._timer)
-                
-                # Cleanup handler
-                bpy.app.handlers.render_complete.remove(self.stop_render_flag)
-                bpy.app.handlers.render_cancel.remove(self.stop_render_flag)
-                
-                # Trigger the conversion operator
-                self.report({'INFO'}, "Render finished. Starting GIF conversion...")
-                bpy.ops.gif.convert()
-                
+        if self._failed:
+            return {'CANCELLED'}
+
+        # No timer runs while rendering, it is only added once the
+        # conversion is running in the background
+        if event.type == 'TIMER' and self._thread is not None:
+            # Show what FFmpeg says
+            if self.poll_job(context):
                 return {'FINISHED'}
 
         return {'PASS_THROUGH'}
 
+    def on_render_done(self):
+        """One-shot bpy.app.timers callback, runs on the main thread"""
+        # Cleanup handler
+        bpy.app.handlers.render_complete.remove(self.stop_render_flag)
+        bpy.app.handlers.render_cancel.remove(self.stop_render_flag)
+
+        # Start the conversion
+        self.report({'INFO'}, "Render finished. Starting GIF conversion...")
+        if not self.start_convert(bpy.context):
+            self._failed = True
+
+        # Don't repeat
+        return None
+
+    def start_convert(self, context):
+        """Run _convert_folder on a worker thread so the UI stays responsive"""
+        scene = context.scene
+        preferences = context.preferences.addons[__name__].preferences
+        ffmpeg_exe = preferences.ffmpeg_path
+
+        # Validate FFmpeg path
+        if not _ffmpeg_is_valid(ffmpeg_exe):
+            self.report({'ERROR'}, "FFmpeg path is invalid in Add-on Preferences")
+            return False
+
+        render_dir, filename_prefix = _render_target(scene)
+        fps = scene.render.fps
+        options = _encode_options(preferences)
+
+        def job(report, log):
+            _convert_folder(
+                ffmpeg_exe, render_dir, filename_prefix, fps,
+                report=report, log=log, **options
+            )
+
+        self.start_job(context.window_manager, self._window, job)
+        return True
+
     def execute(self, context):
         # Ensure format is PNG
         context.scene.render.image_settings.file_format = 'PNG'
@@ -184,17 +692,20 @@ class GIF_OT_render_generate(Operator):
         # Start Render (Invoke Default to allow UI updates)
         bpy.ops.render.render('INVOKE_DEFAULT', animation=True)
 
-        # Start Modal Timer
-        self._timer = context.window_manager.event_timer_add(1.0, window=context.window)
+        # Stay modal, the render handlers tell us when to start converting
+        self._window = context.window
         context.window_manager.modal_handler_add(self)
 
         return {'RUNNING_MODAL'}
     
-    # Callback to flip the flag
+    # Callback to flip the flag and kick off the conversion
     def stop_render_flag(self, scene, context=None): # context is None in some Blender versions for handlers
         scene.gif_is_rendering = False
+        # Handlers may run off the main thread, so start the conversion
+        # from a main thread timer as soon as possible
+        bpy.app.timers.register(self.on_render_done, first_interval=0.0)
 
-class GIF_OT_batch_process(Operator):
+class GIF_OT_batch_process(_BackgroundJob, Operator):
     """Recursively search for folders with PNGs and convert them"""
     bl_idname = "gif.batch_process"
     bl_label = "Batch Convert Folder"
@@ -206,74 +717,59 @@ class GIF_OT_batch_process(Operator):
         subtype='DIR_PATH'
     )
 
+    max_depth: IntProperty(
+        name="Max Depth",
+        description="How many folder levels below the root folder to search",
+        default=6,
+        min=0
+    )
+
+    skip_up_to_date: BoolProperty(
+        name="Skip Up-to-date",
+        description="Don't re-encode folders whose GIF is newer than all of their PNGs",
+        default=True
+    )
+
     def invoke(self, context, event):
         # Open the File Browser to select a folder
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
 
+    def modal(self, context, event):
+        if event.type == 'TIMER' and self.poll_job(context):
+            return {'FINISHED'}
+        return {'PASS_THROUGH'}
+
     def execute(self, context):
         root_folder = self.directory
         scene = context.scene
-        
-        # 1. Store the original render filepath to restore later
-        original_filepath = scene.render.filepath
-        
-        folders_processed = 0
+        preferences = context.preferences.addons[__name__].preferences
+        ffmpeg_exe = preferences.ffmpeg_path
+
+        # Validate FFmpeg path
+        if not _ffmpeg_is_valid(ffmpeg_exe):
+            self.report({'ERROR'}, "FFmpeg path is invalid in Add-on Preferences")
+            return {'CANCELLED'}
+
+        # Copy everything the worker needs, it must not touch bpy data
+        max_depth = self.max_depth
+        skip_up_to_date = self.skip_up_to_date
+        fps = scene.render.fps
+        options = _encode_options(preferences)
 
         self.report({'INFO'}, f"Starting recursive scan in: {root_folder}")
 
-        # 2. Walk through directory tree
-        for dirpath, dirnames, filenames in os.walk(root_folder):
-            
-            # Optimization: Don't process the 'gifs' output folders we create
-            if "gifs" in dirnames:
-                dirnames.remove("gifs")
-
-            # Check for PNGs in current folder
-            pngs = [f for f in filenames if f.lower().endswith('.png')]
-            
-            if pngs:
-                # 3. Determine the Naming Prefix
-                # The existing operator uses scene.render.filepath to determine the prefix.
-                # We need to guess the prefix based on the actual files found.
-                # e.g., if files are "MyAnim_0001.png", prefix is "MyAnim_"
-                
-                common_prefix = os.path.commonprefix(pngs)
-                
-                # If the common prefix includes digits (like "00"), strip them back 
-                # so we get the base name (Blender usually pads with numbers at the end)
-                base_prefix = common_prefix.rstrip('0123456789')
-                
-                # Construct a temporary filepath that simulates how Blender would output here
-                # e.g., C:/FoundFolder/MyAnim_
-                temp_filepath = os.path.join(dirpath, base_prefix)
-                
-                # Update scene variable so the existing operator knows what to do
-                scene.render.filepath = temp_filepath
-                
-                print(f"Processing Folder: {dirpath} | Detected Prefix: '{base_prefix}'")
-
-                try:
-                    # 4. Call the EXISTING operator
-                    # We pass 'EXEC_DEFAULT' so it runs immediately without UI invocation
-                    res = bpy.ops.gif.convert('EXEC_DEFAULT')
-                    
-                    if 'FINISHED' in res:
-                        folders_processed += 1
-                        
-                except Exception as e:
-                    print(f"Skipping folder {dirpath} due to error: {e}")
-                    continue
+        # Scan and convert on a worker thread, modal() shows the progress
+        def job(report, log):
+            _batch_convert(
+                ffmpeg_exe, root_folder, fps, report, log,
+                max_depth=max_depth, skip_up_to_date=skip_up_to_date, **options
+            )
 
-        # 5. Restore original filepath
-        scene.render.filepath = original_filepath
-        
-        if folders_processed > 0:
-            self.report({'INFO'}, f"Batch Complete. Processed {folders_processed} folders.")
-        else:
-            self.report({'WARNING'}, "Batch Complete. No PNG sequences found.")
+        self.start_job(context.window_manager, context.window, job)
+        context.window_manager.modal_handler_add(self)
 
-        return {'FINISHED'}
+        return {'RUNNING_MODAL'}
 
 # ------------------------------------------------------------------------
 #   UI Panel